@@ -0,0 +1,122 @@
+"""Tiny JSON file cache (plus an HTTP body cache on top) shared by the scripts.
+
+Entries are plain JSON files under a cache root (default: `.cache`, relative to
+the working directory like the `data/ashare/...` paths used elsewhere). The
+cache is best-effort: unreadable entries are treated as misses and write errors
+are ignored, so a broken cache never breaks a report or an alert run.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import requests
+
+import _jsonio
+
+DEFAULT_CACHE_DIR = Path(".cache")
+
+
+class FileCache:
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR) -> None:
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        # key: slash-separated relative name, e.g. 'kline/sh600158'
+        return self.root / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Any]:
+        fp = self.path(key)
+        if not fp.exists():
+            return None
+        try:
+            return _jsonio.loads(fp.read_bytes())
+        except Exception:
+            return None
+
+    def store(self, key: str, value: Any) -> None:
+        fp = self.path(key)
+        # Write to a private temp file and rename so concurrent readers never
+        # see a half-written entry.
+        tmp = fp.with_name(f"{fp.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(_jsonio.dumps(value), encoding="utf-8")
+            os.replace(tmp, fp)
+        except OSError:
+            pass
+
+
+def default_ttl(url: str) -> float:
+    """Seconds a cached response body for `url` may be reused without asking the server."""
+    if "hq.sinajs.cn" in url:
+        return 5.0
+    # Any kline, daily included: today's bar is still moving while the market
+    # is open, so bodies are only reused briefly and then revalidated.
+    if "scale=" in url or "klt=" in url:
+        return 30.0
+    return 0.0
+
+
+class HttpCache:
+    """Hash-keyed cache of raw response bodies with per-URL TTLs.
+
+    Within the TTL the stored body is returned without any request. Once it
+    expires the request is sent with If-None-Match / If-Modified-Since (when the
+    server gave us an ETag / Last-Modified) and a 304 simply refreshes the entry.
+    """
+
+    def __init__(self, cache: FileCache, ttl_for: Callable[[str], float] = default_ttl, *, enabled: bool = True) -> None:
+        self.cache = cache
+        self.ttl_for = ttl_for
+        self.enabled = enabled
+
+    def get(
+        self,
+        session: requests.Session,
+        url: str,
+        *,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: int = 10,
+    ) -> bytes:
+        if not self.enabled:
+            r = session.get(url, params=params, headers=headers, timeout=timeout)
+            r.raise_for_status()
+            return r.content
+
+        full_url = requests.Request("GET", url, params=params).prepare().url or url
+        key = "http/" + hashlib.md5(full_url.encode("utf-8")).hexdigest()
+        entry = self.cache.load(key)
+        now = time.time()
+        if entry and now - entry.get("ts", 0) < self.ttl_for(full_url):
+            return base64.b64decode(entry["body"])
+
+        req_headers = dict(headers or {})
+        if entry and entry.get("etag"):
+            req_headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            req_headers["If-Modified-Since"] = entry["last_modified"]
+        r = session.get(url, params=params, headers=req_headers, timeout=timeout)
+        if r.status_code == 304 and entry:
+            entry["ts"] = now
+            self.cache.store(key, entry)
+            return base64.b64decode(entry["body"])
+        r.raise_for_status()
+        self.cache.store(
+            key,
+            {
+                "url": full_url,
+                "ts": now,
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+                "body": base64.b64encode(r.content).decode("ascii"),
+            },
+        )
+        return r.content
@@ -0,0 +1,119 @@
+"""Numeric kernels shared by the report scripts, optionally JIT-compiled.
+
+By default the kernels are plain Python over lists, leaning on the C-level
+`max`/`min`/`sum` builtins; for the few hundred bars in a report that takes
+microseconds. Numba is opt-in: with `ASHARE_NUMBA=1` in the environment (and
+numba + numpy installed) the kernels are compiled with `@njit(cache=True)` and
+columns become NumPy float64 arrays. Importing Numba and loading the compiled
+kernels costs far more than a single report saves, so it is only worth it for
+long-running or heavily batched use.
+
+Callers only go through `column()`, `summarize()` and `classify_code()`, so
+they never need to know which path is active.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Sequence, Tuple
+
+NUMBA_REQUESTED = os.environ.get("ASHARE_NUMBA", "").strip().lower() in ("1", "true", "yes")
+
+# Resolved on first use by _kernels(); None until then.
+HAVE_NUMBA = None
+_np: Any = None
+_summarize: Any = None
+_classify: Any = None
+_lock = threading.Lock()
+
+
+def _summarize_py(o, h, l, c, v, a, lo: int, hi: int) -> Tuple[float, float, float, float, float, float]:
+    return (o[lo], max(h[lo:hi]), min(l[lo:hi]), c[hi - 1], sum(v[lo:hi]), sum(a[lo:hi]))
+
+
+def _summarize_loop(o, h, l, c, v, a, lo, hi):
+    # Single fused pass over [lo, hi); only worth it once compiled.
+    hmax = h[lo]
+    lmin = l[lo]
+    vsum = 0.0
+    asum = 0.0
+    for i in range(lo, hi):
+        if h[i] > hmax:
+            hmax = h[i]
+        if l[i] < lmin:
+            lmin = l[i]
+        vsum += v[i]
+        asum += a[i]
+    return (o[lo], hmax, lmin, c[hi - 1], vsum, asum)
+
+
+def _classify_code(close, preclose, high, low):
+    # Mirrors classify_intraday(): 0 震荡, 1 偏强, 2 偏弱, 3 震荡偏强, 4 震荡偏弱
+    ch = (close / preclose - 1.0) * 100.0 if preclose else 0.0
+    rng = (high / low - 1.0) * 100.0 if low else 0.0
+    if abs(ch) < 0.3 and rng < 1.5:
+        return 0
+    if ch > 0.5:
+        return 1
+    if ch < -0.5:
+        return 2
+    return 3 if ch >= 0 else 4
+
+
+def _kernels() -> bool:
+    """Pick the kernels once (thread-safe); returns whether Numba is active."""
+    global HAVE_NUMBA, _np, _summarize, _classify
+    if HAVE_NUMBA is not None:
+        return HAVE_NUMBA
+    with _lock:
+        if HAVE_NUMBA is None:
+            use = False
+            if NUMBA_REQUESTED:
+                try:
+                    import numpy as np
+                    from numba import njit
+
+                    _np = np
+                    _summarize = njit(cache=True)(_summarize_loop)
+                    _classify = njit(cache=True)(_classify_code)
+                    # Compile (or load from the on-disk cache) now, with the
+                    # argument types real callers use.
+                    x = np.zeros(2, dtype=np.float64)
+                    _summarize(x, x, x, x, x, x, 0, 2)
+                    _classify(1.0, 1.0, 1.0, 1.0)
+                    use = True
+                except Exception:  # graceful degradation: pure Python
+                    use = False
+            if not use:
+                _summarize = _summarize_py
+                _classify = _classify_code
+            HAVE_NUMBA = use
+    return HAVE_NUMBA
+
+
+if NUMBA_REQUESTED:
+    # Scripts import this module and then block on the network for a few
+    # hundred ms; do the Numba import/compile in the background during that
+    # window. The first kernel call waits on the same lock instead of loading
+    # twice.
+    threading.Thread(target=_kernels, name="hotnum-warmup", daemon=True).start()
+
+
+def column(values: Sequence[float]) -> Any:
+    """Store a numeric column in the form the active kernels work on best."""
+    if _kernels():
+        return _np.asarray(values, dtype=_np.float64)
+    return list(values)
+
+
+def summarize(o, h, l, c, v, a, lo: int, hi: int) -> Tuple[float, float, float, float, float, float]:
+    """(open, high, low, close, vol_sum, amt_sum) over bars [lo, hi); requires hi > lo."""
+    _kernels()
+    return tuple(float(x) for x in _summarize(o, h, l, c, v, a, lo, hi))  # type: ignore[return-value]
+
+
+def classify_code(close: float, preclose: float, high: float, low: float) -> int:
+    """Label index for classify_intraday() (see _classify_code)."""
+    _kernels()
+    return int(_classify(close, preclose, high, low))
@@ -0,0 +1,29 @@
+"""JSON helpers shared by the scripts: orjson when installed, stdlib json otherwise.
+
+orjson is optional and only makes parsing/serialising faster; output is the
+same UTF-8 text (non-ASCII kept as-is, like `ensure_ascii=False`).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = False) -> str:
+    if orjson is not None:
+        # OPT_NON_STR_KEYS: stringify int/float dict keys like json.dumps does.
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
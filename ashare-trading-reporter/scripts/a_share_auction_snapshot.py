@@ -23,19 +23,34 @@ Output schema (consumed by a_share_intraday_report_v2.py):
 from __future__ import annotations
 
 import argparse
-import json
-import re
 from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+import _jsonio
+
+
+_SESSION = requests.Session()
+_SESSION.headers.update(
+    {
+        "User-Agent": "Mozilla/5.0",
+        "Referer": "https://finance.sina.com.cn",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    }
+)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 
 def _get(url: str, *, timeout: int = 10) -> str:
-    r = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0", "Referer": "https://finance.sina.com.cn"})
+    r = _SESSION.get(url, timeout=timeout)
     r.raise_for_status()
-    return r.text
+    # Decode explicitly instead of r.text, which may fall back to charset
+    # sniffing on the body. Sina hq quotes are GBK; everything else is UTF-8.
+    return r.content.decode("gbk" if "sinajs" in url else "utf-8", errors="replace")
 
 
 def to_num(x: Any) -> float:
@@ -47,17 +62,23 @@ def to_num(x: Any) -> float:
 
 def fetch_sina(symbol: str) -> dict:
     text = _get(f"https://hq.sinajs.cn/list={symbol}")
-    m = re.search(r'"(.*)"', text)
-    if not m:
+    # var hq_str_sh600158="...";
+    try:
+        payload = text.split('"', 2)[1]
+    except IndexError:
         raise RuntimeError(f"Unexpected quote payload: {text[:200]}")
-    arr = m.group(1).split(",")
+    arr = payload.split(",")
     if len(arr) < 32:
         raise RuntimeError(f"Unexpected quote fields={len(arr)}: {text[:200]}")
 
     # Fields: name, open, preclose, price, high, low, ... vol, amount, ..., date, time
+    try:
+        nums = [float(x) if x else 0.0 for x in arr[1:10]]
+    except ValueError:
+        nums = [to_num(x) for x in arr[1:10]]
     name = arr[0]
-    price = to_num(arr[3])
-    amount = to_num(arr[9])
+    price = nums[2]
+    amount = nums[8]
     d = arr[30]
     t = arr[31]
     dt = None
@@ -101,7 +122,7 @@ def main() -> None:
     }
 
     fp = outdir / f"{d.isoformat()}_{args.symbol}.json"
-    fp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    fp.write_text(_jsonio.dumps(payload, indent=True), encoding="utf-8")
 
     # Print a one-liner for cron logs
     print(f"saved {fp} price={payload['auction_price']} amt={payload['auction_amount']}")
@@ -16,6 +16,8 @@ Design principles (simple, explainable)
 
 Data source
 - Eastmoney daily kline (public): push2his.eastmoney.com
+- Bars are cached under `.cache/kline/`;
+  re-runs only refetch the latest bars (`--no-cache` forces a full download).
 
 Usage
   python3 scripts/a_share_generate_alert_config.py \
@@ -35,25 +37,49 @@ Output schema
 from __future__ import annotations
 
 import argparse
-import json
+import functools
 import math
-from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
+import _jsonio
+from _cache import FileCache
 
-@dataclass
-class DailyBar:
-    date: str
-    open: float
-    close: float
-    high: float
-    low: float
 
+# Eastmoney and the Sina fallback are hit back-to-back; keep the connections alive.
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
+
+# Daily bars are kept column-wise: {'date': [...], 'open': [...], 'close': [...],
+# 'high': [...], 'low': [...]}, oldest first. Callers only reduce over a few
+# columns, so there is no need for one object per bar.
+DAILY_FIELDS = ("date", "open", "close", "high", "low")
+DailyBars = Dict[str, List[Any]]
+
+
+def _daily_rows(bars: DailyBars) -> List[Tuple[Any, ...]]:
+    return list(zip(*(bars[k] for k in DAILY_FIELDS)))
+
+
+def _daily_cols(rows: List[Tuple[Any, ...]]) -> DailyBars:
+    return {k: [r[i] for r in rows] for i, k in enumerate(DAILY_FIELDS)}
+
+
+def _get(url: str, *, timeout: int = 10) -> bytes:
+    # No raw-response cache here: fetch_daily_kline_cached() owns the freshness
+    # of daily bars (today's bar keeps changing until the close).
+    r = _SESSION.get(url, timeout=timeout)
+    r.raise_for_status()
+    return r.content
+
+
+@functools.lru_cache(maxsize=256)
 def symbol_to_secid(symbol: str) -> str:
     # symbol like sh600158 / sz000001
     symbol = symbol.lower().strip()
@@ -64,8 +90,8 @@ def symbol_to_secid(symbol: str) -> str:
     raise ValueError("symbol must start with sh or sz")
 
 
-def fetch_daily_kline(symbol: str, limit: int = 60) -> List[DailyBar]:
-    """Fetch daily bars.
+def fetch_daily_kline(symbol: str, limit: int = 60) -> DailyBars:
+    """Fetch daily bars as columns (see DAILY_FIELDS).
 
     Primary: Eastmoney daily kline.
     Fallback: Sina kline with scale=240 (daily) which is usually very stable.
@@ -81,20 +107,26 @@ def fetch_daily_kline(symbol: str, limit: int = 60) -> List[DailyBar]:
             "&fields1=f1,f2,f3,f4,f5"
             "&fields2=f51,f52,f53,f54,f55,f56,f57,f58"
         )
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        js = r.json()
+        js = _jsonio.loads(_get(url))
         data = (js or {}).get("data") or {}
         kl = data.get("klines") or []
-        out: List[DailyBar] = []
+        dates: List[str] = []
+        opens: List[float] = []
+        closes: List[float] = []
+        highs: List[float] = []
+        lows: List[float] = []
         for line in kl:
-            parts = str(line).split(",")
+            # "YYYY-MM-DD,open,close,high,low,..."; only the first five fields are used
+            parts = line.split(",", 5)
             if len(parts) < 5:
                 continue
-            d, o, c, h, l = parts[0], parts[1], parts[2], parts[3], parts[4]
-            out.append(DailyBar(date=d, open=float(o), close=float(c), high=float(h), low=float(l)))
-        if len(out) >= 5:
-            return out
+            dates.append(parts[0])
+            opens.append(float(parts[1]))
+            closes.append(float(parts[2]))
+            highs.append(float(parts[3]))
+            lows.append(float(parts[4]))
+        if len(dates) >= 5:
+            return {"date": dates, "open": opens, "close": closes, "high": highs, "low": lows}
     except Exception:
         pass
 
@@ -104,51 +136,93 @@ def fetch_daily_kline(symbol: str, limit: int = 60) -> List[DailyBar]:
         "CN_MarketDataService.getKLineData"
         f"?symbol={symbol}&scale=240&ma=no&datalen={limit}"
     )
-    r = requests.get(url, timeout=10)
-    r.raise_for_status()
-    js = r.json()
-    out: List[DailyBar] = []
-    for row in js:
-        # day: 'YYYY-MM-DD'
-        d = str(row.get("day"))
-        o = float(row.get("open"))
-        h = float(row.get("high"))
-        l = float(row.get("low"))
-        c = float(row.get("close"))
-        out.append(DailyBar(date=d, open=o, close=c, high=h, low=l))
-    return out
+    js = _jsonio.loads(_get(url))
+    # day: 'YYYY-MM-DD'
+    return {
+        "date": [str(row.get("day")) for row in js],
+        "open": [float(row.get("open")) for row in js],
+        "close": [float(row.get("close")) for row in js],
+        "high": [float(row.get("high")) for row in js],
+        "low": [float(row.get("low")) for row in js],
+    }
+
+
+# Cached daily bars are reused for a few hours on the same day; after that only
+# the tail is refetched and merged, since older daily bars do not change.
+KLINE_CACHE_TTL_S = 4 * 3600
+
+
+def fetch_daily_kline_cached(symbol: str, limit: int = 60, *, cache: Optional[FileCache] = None) -> DailyBars:
+    """fetch_daily_kline() backed by an on-disk cache under `.cache/kline/`.
+
+    - Fresh entry (fetched today, within KLINE_CACHE_TTL_S): no network at all.
+    - Stale entry: fetch only the last few bars and overwrite same-date rows.
+    - Adjusted prices (fqt=1) shift history after ex-dividend days; if the
+      overlapping finished bars disagree with the cache, do a full refetch.
+    """
+    if cache is None:
+        return fetch_daily_kline(symbol, limit=limit)
+
+    key = f"kline/{symbol}"
+    entry = cache.load(key) or {}
+    now = datetime.now()
+    try:
+        cached = _daily_rows(entry["bars"]) if entry.get("bars") else []
+        fetched_at = datetime.fromisoformat(entry["fetched_at"]) if entry.get("fetched_at") else None
+    except Exception:
+        cached, fetched_at = [], None
+
+    if cached and len(cached) >= limit and fetched_at:
+        if fetched_at.date() == now.date() and (now - fetched_at).total_seconds() < KLINE_CACHE_TTL_S:
+            return _daily_cols(cached[-limit:])
+
+    rows: Optional[List[Tuple[Any, ...]]] = None
+    if cached and len(cached) >= limit:
+        try:
+            last_day = date.fromisoformat(cached[-1][0][:10])
+            # Calendar days >= trading days, so this always overlaps the cache.
+            # Eastmoney answers with < 5 bars are treated as failures, hence the floor.
+            n = min(limit, max(5, (now.date() - last_day).days + 2))
+            tail = _daily_rows(fetch_daily_kline(symbol, limit=n))
+        except Exception:
+            tail = []
+        by_date = {r[0]: r for r in cached}
+        overlap = [r for r in tail if r[0] in by_date and r[0] != cached[-1][0]]
+        if tail and overlap and all(by_date[r[0]] == r for r in overlap):
+            by_date.update((r[0], r) for r in tail)
+            rows = [by_date[d] for d in sorted(by_date)]
+
+    if rows is None:
+        rows = _daily_rows(fetch_daily_kline(symbol, limit=limit))
+
+    keep = max(limit, len(cached))
+    cache.store(key, {"symbol": symbol, "fetched_at": now.isoformat(timespec="seconds"), "bars": _daily_cols(rows[-keep:])})
+    return _daily_cols(rows[-limit:])
 
 
 def round_step(price: float) -> float:
+    # All thresholds are integers, so the integer part of the price decides the step.
+    return _round_step_bucket(int(price))
+
+
+@functools.lru_cache(maxsize=256)
+def _round_step_bucket(bucket: int) -> float:
     # simple tick for round numbers: 0.1 below 10, 0.5 below 50, 1 below 200, 5 above
-    if price < 10:
+    if bucket < 10:
         return 0.1
-    if price < 50:
+    if bucket < 50:
         return 0.5
-    if price < 200:
+    if bucket < 200:
         return 1.0
     return 5.0
 
 
+@functools.lru_cache(maxsize=256)
 def next_round_above(price: float) -> float:
     step = round_step(price)
     return math.ceil(price / step) * step
 
 
-def uniq_sorted(levels: List[float], *, ndigits: int = 2) -> List[float]:
-    seen = set()
-    out = []
-    for x in sorted(levels):
-        v = round(float(x), ndigits)
-        if v <= 0:
-            continue
-        if v in seen:
-            continue
-        seen.add(v)
-        out.append(v)
-    return out
-
-
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--symbol", required=True, help="e.g. sh600158")
@@ -156,24 +230,24 @@ def main() -> None:
     ap.add_argument("--days", type=int, default=20, help="lookback trading days for upside level")
     ap.add_argument("--breakdown-days", type=int, default=5, help="lookback trading days for downside breakdown level")
     ap.add_argument("--vwap-cross", default="true", choices=["true", "false"], help="enable VWAP cross trigger")
+    ap.add_argument("--no-cache", action="store_true", help="always refetch daily bars (skip .cache/kline)")
     args = ap.parse_args()
 
-    bars = fetch_daily_kline(args.symbol, limit=max(args.days, 20) + 5)
-    if len(bars) < 5:
+    cache = None if args.no_cache else FileCache()
+    bars = fetch_daily_kline_cached(args.symbol, limit=max(args.days, 20) + 5, cache=cache)
+    if len(bars["date"]) < 5:
         raise SystemExit("not enough daily bars")
 
-    recent_up = bars[-args.days :]
-    recent_dn = bars[-args.breakdown_days :]
-    last = bars[-1]
+    last_close = bars["close"][-1]
 
-    hi = max(b.high for b in recent_up)
-    lo = min(b.low for b in recent_dn)
+    hi = max(bars["high"][-args.days :])
+    lo = min(bars["low"][-args.breakdown_days :])
 
     # Upside levels: (1) round above last close (2) recent high
-    lv1 = next_round_above(last.close)
+    lv1 = next_round_above(last_close)
     lv2 = hi
 
-    levels_up = uniq_sorted([lv1, lv2])
+    levels_up = sorted(v for v in {round(lv1, 2), round(lv2, 2)} if v > 0)
     breakdown = round(lo, 2)
 
     cfg: Dict[str, Any] = {
@@ -185,7 +259,7 @@ def main() -> None:
             "symbol": args.symbol,
             "lookback_days_up": args.days,
         "lookback_days_down": args.breakdown_days,
-            "last_close": round(last.close, 2),
+            "last_close": round(last_close, 2),
             "recent_high": round(hi, 2),
             "recent_low": round(lo, 2),
             "method": "round_above_last_close + recent_high(N_up) + recent_low(N_down)",
@@ -195,7 +269,7 @@ def main() -> None:
 
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(cfg, ensure_ascii=False, indent=2), encoding="utf-8")
+    out_path.write_text(_jsonio.dumps(cfg, indent=True), encoding="utf-8")
 
 
 if __name__ == "__main__":
@@ -5,22 +5,53 @@ Data sources (public):
 - Realtime quote: https://hq.sinajs.cn/list=sh600158
 - Kline (5m/1m): https://quotes.sina.cn/cn/api/json_v2.php/CN_MarketDataService.getKLineData
 
-This script is intentionally dependency-light (no pandas).
+This script is intentionally dependency-light (no pandas). Numba is
+opt-in (ASHARE_NUMBA=1) for the numeric kernels in _hotnum.py; it is not required.
 """
 
 from __future__ import annotations
 
 import argparse
 import math
-import re
+import sys
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, date, time
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, date
+from operator import itemgetter
+from typing import Any, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+import _hotnum
+import _jsonio
+from _cache import FileCache, HttpCache
+
+
+# One keep-alive session for every call so repeated requests to the same host
+# reuse the TCP/TLS connection. Pool size covers the concurrent fan-out in
+# build_report.
+_SESSION = requests.Session()
+_SESSION.headers.update(
+    {
+        "User-Agent": "Mozilla/5.0",
+        "Referer": "https://finance.sina.com.cn",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    }
+)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Short-lived response cache (.cache/http) so back-to-back runs skip the network.
+_HTTP = HttpCache(FileCache())
+
 
+# slots=True needs Python 3.10+; older interpreters get a plain frozen dataclass.
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Ohlc:
     open: float
     high: float
@@ -35,68 +66,84 @@ class Ohlc:
 
 
 def _get(url: str, *, timeout: int = 10, headers: Optional[dict] = None) -> str:
-    r = requests.get(url, timeout=timeout, headers=headers)
-    r.raise_for_status()
-    return r.text
-
+    body = _HTTP.get(_SESSION, url, timeout=timeout, headers=headers)
+    # Decode explicitly instead of r.text, which may fall back to charset
+    # sniffing on the body. Sina hq quotes are GBK; everything else is UTF-8.
+    return body.decode("gbk" if "sinajs" in url else "utf-8", errors="replace")
 
-def fetch_realtime_quote(symbol: str) -> Dict[str, Any]:
-    """Fetch realtime quote from Sina hq endpoint.
 
-    symbol: like 'sh600158'
-    """
-    text = _get(
-        f"https://hq.sinajs.cn/list={symbol}",
-        headers={"Referer": "https://finance.sina.com.cn"},
-    )
-    m = re.search(r'"(.*)"', text)
-    if not m:
-        raise RuntimeError(f"Unexpected quote payload: {text[:200]}")
-    arr = m.group(1).split(",")
+def _parse_quote(payload: str, raw: str) -> Dict[str, Any]:
+    arr = payload.split(",")
     if len(arr) < 32:
-        raise RuntimeError(f"Unexpected quote fields={len(arr)}: {text[:200]}")
+        raise RuntimeError(f"Unexpected quote fields={len(arr)}: {raw[:200]}")
 
-    def f(i: int) -> float:
-        try:
-            return float(arr[i]) if arr[i] else 0.0
-        except Exception:
-            return 0.0
+    # arr[1:10]: open, preclose, price, high, low, bid, ask, volume, amount.
+    # Clean numbers are the norm; only fall back to per-field to_num() if not.
+    try:
+        nums = [float(x) if x else 0.0 for x in arr[1:10]]
+    except ValueError:
+        nums = [to_num(x) for x in arr[1:10]]
 
     return {
         "name": arr[0],
-        "open": f(1),
-        "preclose": f(2),
-        "price": f(3),
-        "high": f(4),
-        "low": f(5),
+        "open": nums[0],
+        "preclose": nums[1],
+        "price": nums[2],
+        "high": nums[3],
+        "low": nums[4],
         # volume: shares? sina gives hands? For A-share: vol is shares in this endpoint (commonly shares)
-        "volume": f(8),
-        "amount": f(9),
+        "volume": nums[7],
+        "amount": nums[8],
         "date": arr[30],
         "time": arr[31],
-        "raw": text.strip(),
+        "raw": raw,
     }
 
 
+def fetch_realtime_quotes(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch several realtime quotes with one request to the Sina hq endpoint.
+
+    symbols: like ['sh600158', 'sh000001']; returns {symbol: quote}.
+    """
+    text = _get(f"https://hq.sinajs.cn/list={','.join(symbols)}")
+    out: Dict[str, Dict[str, Any]] = {}
+    # One line per symbol: var hq_str_sh600158="...";
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            head, payload = line.split('"', 2)[:2]
+        except ValueError:
+            raise RuntimeError(f"Unexpected quote payload: {line[:200]}")
+        sym = head.rsplit("hq_str_", 1)[-1].rstrip("=")
+        out[sym] = _parse_quote(payload, line)
+    missing = [s for s in symbols if s not in out]
+    if missing:
+        raise RuntimeError(f"Missing quotes for {missing}: {text[:200]}")
+    return out
+
+
+def fetch_realtime_quote(symbol: str) -> Dict[str, Any]:
+    """Fetch realtime quote from Sina hq endpoint.
+
+    symbol: like 'sh600158'
+    """
+    return fetch_realtime_quotes([symbol])[symbol]
+
+
 def fetch_kline(symbol: str, scale: int, datalen: int = 500) -> List[Dict[str, Any]]:
     url = (
         "https://quotes.sina.cn/cn/api/json_v2.php/"
         "CN_MarketDataService.getKLineData"
         f"?symbol={symbol}&scale={scale}&ma=no&datalen={datalen}"
     )
-    r = requests.get(url, timeout=10)
-    r.raise_for_status()
-    js = r.json()
+    js = _jsonio.loads(_HTTP.get(_SESSION, url))
     if not isinstance(js, list):
         raise RuntimeError(f"Unexpected kline json: {str(js)[:200]}")
     return js
 
 
-def parse_dt(s: str) -> datetime:
-    # examples: '2026-02-10 15:00:00'
-    return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
-
-
 def to_num(x: Any) -> float:
     try:
         return float(x)
@@ -104,15 +151,35 @@ def to_num(x: Any) -> float:
         return 0.0
 
 
-def summarize_ohlc(rows: List[Dict[str, Any]]) -> Optional[Ohlc]:
-    if not rows:
+def kline_columns(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Parse sorted kline rows once into per-field float columns.
+
+    'hms' is the bar's 'HH:MM:SS' (rows look like '2026-02-10 15:00:00'); it is
+    sorted like the rows, so time windows can be located with bisect instead of
+    re-scanning every row.
+    """
+    cols: Dict[str, Any] = {}
+    for k in ("open", "high", "low", "close", "volume", "amount"):
+        get = itemgetter(k)
+        # Fields are numeric strings; `or 0` covers empty ones without an exception.
+        try:
+            vals = [float(get(r) or 0) for r in rows]
+        except (KeyError, TypeError, ValueError):
+            vals = [to_num(r.get(k)) for r in rows]
+        cols[k] = _hotnum.column(vals)
+    cols["hms"] = [r["day"][11:19] for r in rows]
+    return cols
+
+
+def summarize_ohlc(cols: Dict[str, Any], lo: int = 0, hi: Optional[int] = None) -> Optional[Ohlc]:
+    # Summarize bars [lo, hi) of kline_columns() output.
+    if hi is None:
+        hi = len(cols["close"])
+    if hi <= lo:
         return None
-    o = to_num(rows[0]["open"])
-    h = max(to_num(r["high"]) for r in rows)
-    l = min(to_num(r["low"]) for r in rows)
-    c = to_num(rows[-1]["close"])
-    vol = sum(to_num(r.get("volume")) for r in rows)
-    amt = sum(to_num(r.get("amount")) for r in rows)
+    o, h, l, c, vol, amt = _hotnum.summarize(
+        cols["open"], cols["high"], cols["low"], cols["close"], cols["volume"], cols["amount"], lo, hi
+    )
     return Ohlc(open=o, high=h, low=l, close=c, vol=vol, amt=amt)
 
 
@@ -128,40 +195,30 @@ def fmt_pct(x: Optional[float]) -> str:
     return f"{x:+.2f}%"
 
 
+# Chinese magnitude units: index by bisect_right(_UNIT_BOUNDS, x) instead of
+# walking an if-cascade.
+_UNIT_BOUNDS = (1e4, 1e8)
+_UNITS = ((1.0, ""), (1e4, "万"), (1e8, "亿"))
+
+
 def fmt_money(x: float) -> str:
     # x in yuan
-    if x >= 1e8:
-        return f"{x/1e8:.2f}亿"
-    if x >= 1e4:
-        return f"{x/1e4:.2f}万"
-    return f"{x:.0f}"
+    div, unit = _UNITS[bisect_right(_UNIT_BOUNDS, x)]
+    return f"{x/div:.2f}{unit}" if unit else f"{x:.0f}"
 
 
 def fmt_vol(x: float) -> str:
-    if x >= 1e8:
-        return f"{x/1e8:.2f}亿股"
-    if x >= 1e4:
-        return f"{x/1e4:.2f}万股"
-    return f"{x:.0f}股"
+    div, unit = _UNITS[bisect_right(_UNIT_BOUNDS, x)]
+    return f"{x/div:.2f}{unit}股" if unit else f"{x:.0f}股"
 
 
-def classify_intraday(open_: float, high: float, low: float, close: float, preclose: float) -> str:
-    # Very simple “human” label.
-    ch = pct(close, preclose) or 0.0
-    rng = (pct(high, low) or 0.0)
-    if abs(ch) < 0.3 and rng < 1.5:
-        return "震荡"
-    if ch > 0.5:
-        return "偏强"
-    if ch < -0.5:
-        return "偏弱"
-    return "震荡偏{}".format("强" if ch >= 0 else "弱")
+_INTRADAY_LABELS = ("震荡", "偏强", "偏弱", "震荡偏强", "震荡偏弱")
 
 
-def index_quote(symbol: str) -> Tuple[float, float]:
-    # returns (price, preclose)
-    q = fetch_realtime_quote(symbol)
-    return float(q["price"]), float(q["preclose"])
+def classify_intraday(open_: float, high: float, low: float, close: float, preclose: float) -> str:
+    # Very simple “human” label: |change| < 0.3% in a < 1.5% range is 震荡,
+    # beyond ±0.5% is 偏强/偏弱, otherwise 震荡 leaning by the sign of the change.
+    return _INTRADAY_LABELS[_hotnum.classify_code(close, preclose, high, low)]
 
 
 def build_report(
@@ -171,46 +228,65 @@ def build_report(
     report_date: date,
     mode: str,
     scale: int = 5,
+    preloaded_quote: Optional[Dict[str, Any]] = None,
 ) -> str:
-    """mode: 'mid' or 'close'"""
+    """mode: 'mid' or 'close'
+
+    preloaded_quote: the stock's fetch_realtime_quote() result if the caller
+    already has it; it is then left out of the batched quote request.
+    """
+
+    symbols = ["sh000001", "sz399001", "sz399006"]
+    if preloaded_quote is None:
+        symbols.insert(0, stock_symbol)
+
+    # The stock and index quotes share one batched request; it and the kline
+    # request are independent, so issue both concurrently.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        f_quotes = pool.submit(fetch_realtime_quotes, symbols)
+        f_kline = pool.submit(fetch_kline, stock_symbol, scale=scale, datalen=800)
+        quotes = f_quotes.result()
+        kl = f_kline.result()
+
+    quote = preloaded_quote if preloaded_quote is not None else quotes[stock_symbol]
+    sh_px, sh_pre = quotes["sh000001"]["price"], quotes["sh000001"]["preclose"]
+    sz_px, sz_pre = quotes["sz399001"]["price"], quotes["sz399001"]["preclose"]
+    cyb_px, cyb_pre = quotes["sz399006"]["price"], quotes["sz399006"]["preclose"]
 
-    quote = fetch_realtime_quote(stock_symbol)
     preclose = float(quote["preclose"])
     open_ = float(quote["open"])
     high_rt = float(quote["high"])
     low_rt = float(quote["low"])
     last_px = float(quote["price"])
 
-    kl = fetch_kline(stock_symbol, scale=scale, datalen=800)
-    rows = [r for r in kl if r.get("day", "").startswith(report_date.isoformat())]
-    for r in rows:
-        r["_dt"] = parse_dt(r["day"])
-
-    rows.sort(key=lambda r: r["_dt"])
+    # Fixed-width ISO timestamps sort and compare correctly as plain strings.
+    # Sina returns bars oldest first, so the report day is one contiguous slice;
+    # the sorted() check is a single C-level pass on already ordered input.
+    days = [r["day"] for r in kl]
+    if days != sorted(days):
+        kl = sorted(kl, key=lambda r: r["day"])
+        days = [r["day"] for r in kl]
+    d = report_date.isoformat()
+    rows = kl[bisect_left(days, f"{d} 00:00:00") : bisect_right(days, f"{d} 23:59:59")]
+    cols = kline_columns(rows)
+    hms = cols["hms"]
 
     # trading sessions (A-share)
-    morning_end = datetime.combine(report_date, time(11, 30))
     if mode == "mid":
-        use_rows = [r for r in rows if r["_dt"] <= morning_end]
+        use_hi = bisect_right(hms, "11:30:00")
     else:
-        use_rows = rows
+        use_hi = len(rows)
 
-    ohlc = summarize_ohlc(use_rows)
+    ohlc = summarize_ohlc(cols, 0, use_hi)
     if not ohlc:
         raise RuntimeError("No kline rows for date; market closed or data unavailable")
 
     # segment analysis
-    def segment(t0: time, t1: time) -> Optional[Ohlc]:
-        seg = [r for r in rows if t0 <= r["_dt"].time() <= t1]
-        return summarize_ohlc(seg) if seg else None
+    def segment(t0: str, t1: str) -> Optional[Ohlc]:
+        return summarize_ohlc(cols, bisect_left(hms, t0), bisect_right(hms, t1))
 
-    seg_open30 = segment(time(9, 30), time(10, 0))
-    seg_last30 = segment(time(14, 30), time(15, 0))
-
-    # indices
-    sh_px, sh_pre = index_quote("sh000001")
-    sz_px, sz_pre = index_quote("sz399001")
-    cyb_px, cyb_pre = index_quote("sz399006")
+    seg_open30 = segment("09:30:00", "10:00:00")
+    seg_last30 = segment("14:30:00", "15:00:00")
 
     # output
     if mode == "mid":
@@ -288,14 +364,28 @@ def main() -> None:
     ap.add_argument("--mode", choices=["mid", "close"], required=True)
     ap.add_argument("--date", default="", help="YYYY-MM-DD, default: today")
     ap.add_argument("--scale", type=int, default=5, help="Kline scale minutes (1/5/15/30/60)")
+    ap.add_argument("--no-cache", action="store_true", help="Bypass the short-lived response cache in .cache/http")
     args = ap.parse_args()
 
-    d = date.today() if not args.date else datetime.strptime(args.date, "%Y-%m-%d").date()
+    _HTTP.enabled = not args.no_cache
 
-    q = fetch_realtime_quote(args.symbol)
-    name = args.name or q.get("name") or args.symbol
+    d = date.today() if not args.date else datetime.strptime(args.date, "%Y-%m-%d").date()
 
-    print(build_report(stock_symbol=args.symbol, stock_name=name, report_date=d, mode=args.mode, scale=args.scale))
+    # The quote is only needed up front to look up the display name; hand it
+    # to build_report so it is not requested twice.
+    q = None if args.name else fetch_realtime_quote(args.symbol)
+    name = args.name or (q or {}).get("name") or args.symbol
+
+    print(
+        build_report(
+            stock_symbol=args.symbol,
+            stock_name=name,
+            report_date=d,
+            mode=args.mode,
+            scale=args.scale,
+            preloaded_quote=q,
+        )
+    )
 
 
 if __name__ == "__main__":
@@ -17,30 +17,56 @@ Auction (09:25) note:
 - This script supports reading a pre-captured auction snapshot JSON (saved by a cron around 09:25-09:29).
 - If snapshot missing, report falls back to "open gap" wording.
 
-No pandas; dependency-light.
+Caching:
+- Quotes and klines are cached under `.cache/` (CachedProvider). Klines of a
+  finished session are kept for good, live data only for 30-60s. Raw kline
+  responses are also kept and revalidated with ETag / If-Modified-Since.
+  `--no-cache` bypasses both.
+
+Batch:
+- `--symbols sh600158,sz000001,...` prints one report per symbol (in input
+  order), built concurrently; the index quotes are fetched once for all.
+
+No pandas; dependency-light. Numba is opt-in
+(ASHARE_NUMBA=1) for the numeric kernels in _hotnum.py; it is not required.
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
 import json
 import math
 import os
 import re
-from dataclasses import dataclass
+import sys
+import time as _time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import date, datetime, time
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import _hotnum
+import _jsonio
+from _cache import FileCache, HttpCache
 
 
 # -------------------------
 # Common data structures
 # -------------------------
 
+# slots=True needs Python 3.10+; older interpreters get a plain dataclass.
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)  # not frozen: ProviderChain stamps .source
 class Quote:
     name: str
     open: float
@@ -54,7 +80,7 @@ class Quote:
     source: str = ""
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Bar:
     dt: datetime
     open: float
@@ -65,7 +91,7 @@ class Bar:
     amount: float  # yuan
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Ohlc:
     open: float
     high: float
@@ -79,15 +105,69 @@ class Ohlc:
         return (self.amt / self.vol) if self.vol else None
 
 
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
+class BarArray:
+    """Sorted bars as parallel columns (struct of arrays) for the summaries.
+
+    `hms` is each bar's time of day as an int HHMMSS; it is sorted like the
+    bars, so time windows are located with bisect instead of re-filtering.
+    The numeric columns are whatever `_hotnum.column()` produces.
+    """
+
+    hms: List[int]
+    open: Any
+    high: Any
+    low: Any
+    close: Any
+    volume: Any
+    amount: Any
+
+    @classmethod
+    def from_bars(cls, bars: List[Bar]) -> "BarArray":
+        def col(k: str) -> Any:
+            return _hotnum.column([getattr(b, k) for b in bars])
+
+        return cls(
+            hms=[b.dt.hour * 10000 + b.dt.minute * 100 + b.dt.second for b in bars],
+            open=col("open"),
+            high=col("high"),
+            low=col("low"),
+            close=col("close"),
+            volume=col("volume"),
+            amount=col("amount"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.hms)
+
+
 # -------------------------
 # Utils
 # -------------------------
 
 
+# One pooled keep-alive session for every provider call; transient 429/5xx
+# answers are retried a couple of times before a provider counts as failed.
+# Reports built concurrently in --symbols batch mode; each one keeps up to two
+# requests in flight, so the connection pool is sized to match.
+BATCH_WORKERS = 8
+
+_RETRY = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=2 * BATCH_WORKERS, max_retries=_RETRY))
+
+# Raw kline bodies (.cache/http): reused within a short TTL, then revalidated
+# with If-None-Match / If-Modified-Since so an unchanged kline costs a 304.
+_HTTP = HttpCache(FileCache())
+
+
+_SECID_RE = re.compile(r"(sh|sz)(\d{6})")
+_WATCH_SPLIT_RE = re.compile(r"[ ,/]+")
+
+
 def _get(url: str, *, timeout: int = 10, headers: Optional[dict] = None, params: Optional[dict] = None) -> requests.Response:
-    headers = headers or {}
-    headers.setdefault("User-Agent", "Mozilla/5.0")
-    r = requests.get(url, params=params, timeout=timeout, headers=headers)
+    r = _SESSION.get(url, params=params, timeout=timeout, headers=headers)
     r.raise_for_status()
     return r
 
@@ -111,48 +191,51 @@ def fmt_pct(x: Optional[float]) -> str:
     return f"{x:+.2f}%"
 
 
+# Chinese magnitude units: index by bisect_right(_UNIT_BOUNDS, x) instead of
+# walking an if-cascade.
+_UNIT_BOUNDS = (1e4, 1e8)
+_UNITS = ((1.0, ""), (1e4, "万"), (1e8, "亿"))
+
+
 def fmt_money(x: float) -> str:
-    if x >= 1e8:
-        return f"{x/1e8:.2f}亿"
-    if x >= 1e4:
-        return f"{x/1e4:.2f}万"
-    return f"{x:.0f}"
+    # x in yuan
+    div, unit = _UNITS[bisect_right(_UNIT_BOUNDS, x)]
+    return f"{x/div:.2f}{unit}" if unit else f"{x:.0f}"
 
 
 def fmt_vol(x: float) -> str:
-    if x >= 1e8:
-        return f"{x/1e8:.2f}亿股"
-    if x >= 1e4:
-        return f"{x/1e4:.2f}万股"
-    return f"{x:.0f}股"
+    div, unit = _UNITS[bisect_right(_UNIT_BOUNDS, x)]
+    return f"{x/div:.2f}{unit}股" if unit else f"{x:.0f}股"
 
 
 def parse_dt(s: str) -> datetime:
-    return datetime.strptime(s, "%Y-%m-%d %H:%M") if len(s) == 16 else datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
+    # Called once per kline row; the layout is fixed ('YYYY-MM-DD HH:MM' or
+    # 'YYYY-MM-DD HH:MM:SS'), so slice it instead of paying for strptime.
+    n = len(s)
+    if (n == 16 or n == 19) and s[4] == "-" and s[7] == "-" and s[13] == ":":
+        return datetime(
+            int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19]) if n == 19 else 0
+        )
+    return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
 
 
-def summarize_ohlc(bars: List[Bar]) -> Optional[Ohlc]:
-    if not bars:
+def summarize_ohlc(bars: BarArray, lo: int = 0, hi: Optional[int] = None) -> Optional[Ohlc]:
+    # Summarize bars [lo, hi).
+    if hi is None:
+        hi = len(bars)
+    if hi <= lo:
         return None
-    o = bars[0].open
-    h = max(b.high for b in bars)
-    l = min(b.low for b in bars)
-    c = bars[-1].close
-    vol = sum(b.volume for b in bars)
-    amt = sum(b.amount for b in bars)
+    o, h, l, c, vol, amt = _hotnum.summarize(bars.open, bars.high, bars.low, bars.close, bars.volume, bars.amount, lo, hi)
     return Ohlc(open=o, high=h, low=l, close=c, vol=vol, amt=amt)
 
 
+_INTRADAY_LABELS = ("震荡", "偏强", "偏弱", "震荡偏强", "震荡偏弱")
+
+
 def classify_intraday(open_: float, high: float, low: float, close: float, preclose: float) -> str:
-    ch = pct(close, preclose) or 0.0
-    rng = pct(high, low) or 0.0
-    if abs(ch) < 0.3 and rng < 1.5:
-        return "震荡"
-    if ch > 0.5:
-        return "偏强"
-    if ch < -0.5:
-        return "偏弱"
-    return "震荡偏{}".format("强" if ch >= 0 else "弱")
+    # |change| < 0.3% in a < 1.5% range is 震荡, beyond ±0.5% is 偏强/偏弱,
+    # otherwise 震荡 leaning by the sign of the change.
+    return _INTRADAY_LABELS[_hotnum.classify_code(close, preclose, high, low)]
 
 
 # -------------------------
@@ -160,9 +243,31 @@ def classify_intraday(open_: float, high: float, low: float, close: float, precl
 # -------------------------
 
 
+def _chronological(bars: List[Bar]) -> List[Bar]:
+    # Both kline APIs already return bars oldest-first; check that in one
+    # linear pass and only fall back to sorting if a source ever breaks it.
+    if any(b.dt < a.dt for a, b in zip(bars, bars[1:])):
+        bars.sort(key=lambda b: b.dt)
+    return bars
+
+
+@functools.lru_cache(maxsize=256)
+def _secid(symbol: str) -> str:
+    # Eastmoney secid: sh600158 -> 1.600158, sz000001 -> 0.000001
+    m = _SECID_RE.fullmatch(symbol)
+    if not m:
+        raise ValueError(f"Bad symbol: {symbol}")
+    ex, code = m.group(1), m.group(2)
+    market = "1" if ex == "sh" else "0"
+    return f"{market}.{code}"
+
+
 class Provider:
     name = "base"
 
+    def describe(self) -> str:
+        return type(self).__name__
+
     def quote(self, symbol: str) -> Quote:  # symbol: sh600158 / sz399001
         raise NotImplementedError
 
@@ -173,24 +278,15 @@ class Provider:
 class EastmoneyProvider(Provider):
     name = "eastmoney"
 
-    @staticmethod
-    def _secid(symbol: str) -> str:
-        m = re.fullmatch(r"(sh|sz)(\d{6})", symbol)
-        if not m:
-            raise ValueError(f"Bad symbol: {symbol}")
-        ex, code = m.group(1), m.group(2)
-        market = "1" if ex == "sh" else "0"
-        return f"{market}.{code}"
-
     def quote(self, symbol: str) -> Quote:
-        secid = self._secid(symbol)
+        secid = _secid(symbol)
         fields = "f58,f43,f44,f45,f46,f60,f47,f48,f86"
         r = _get(
             "https://push2.eastmoney.com/api/qt/stock/get",
             params={"secid": secid, "fields": fields},
             headers={"Referer": "https://quote.eastmoney.com"},
         )
-        data = r.json().get("data") or {}
+        data = _jsonio.loads(r.content).get("data") or {}
         # Prices are typically scaled by 100 for A-share.
         px = to_num(data.get("f43")) / 100.0
         high = to_num(data.get("f44")) / 100.0
@@ -215,11 +311,12 @@ class EastmoneyProvider(Provider):
         )
 
     def kline(self, symbol: str, *, scale_min: int, day: date) -> List[Bar]:
-        secid = self._secid(symbol)
+        secid = _secid(symbol)
         # klt: 1/5/15/30/60
         klt = int(scale_min)
         ds = day.strftime("%Y%m%d")
-        r = _get(
+        body = _HTTP.get(
+            _SESSION,
             "https://push2his.eastmoney.com/api/qt/stock/kline/get",
             params={
                 "secid": secid,
@@ -233,37 +330,53 @@ class EastmoneyProvider(Provider):
             },
             headers={"Referer": "https://quote.eastmoney.com"},
         )
-        js = r.json()
+        js = _jsonio.loads(body)
         kl = (js.get("data") or {}).get("klines") or []
         out: List[Bar] = []
         for line in kl:
-            # "YYYY-MM-DD HH:MM,open,close,high,low,volume,amount,..."
-            parts = str(line).split(",")
+            # "YYYY-MM-DD HH:MM,open,close,high,low,volume,amount,..."; only
+            # the first 7 fields are used, so don't split the tail apart.
+            parts = line.split(",", 7)
             if len(parts) < 7:
                 continue
-            dt = parse_dt(parts[0])
-            o, c, h, l = map(float, parts[1:5])
-            vol_lot = to_num(parts[5])
-            amt = to_num(parts[6])
-            out.append(Bar(dt=dt, open=o, high=h, low=l, close=c, volume=vol_lot * 100.0, amount=amt))
-        out.sort(key=lambda b: b.dt)
-        return out
+            try:
+                vol_lot = float(parts[5] or 0)
+                amt = float(parts[6] or 0)
+            except ValueError:
+                vol_lot = to_num(parts[5])
+                amt = to_num(parts[6])
+            out.append(
+                Bar(
+                    dt=parse_dt(parts[0]),
+                    open=float(parts[1]),
+                    high=float(parts[3]),
+                    low=float(parts[4]),
+                    close=float(parts[2]),
+                    volume=vol_lot * 100.0,
+                    amount=amt,
+                )
+            )
+        return _chronological(out)
 
 
 class SinaProvider(Provider):
     name = "sina"
 
     def quote(self, symbol: str) -> Quote:
-        text = _get(
+        raw = _get(
             f"https://hq.sinajs.cn/list={symbol}",
             headers={"Referer": "https://finance.sina.com.cn"},
-        ).text
-        m = re.search(r'"(.*)"', text)
-        if not m:
-            raise RuntimeError(f"Unexpected quote payload: {text[:200]}")
-        arr = m.group(1).split(",")
+        ).content
+        # var hq_str_sh600158="..."; -- the body is GBK; find the quoted payload
+        # on the bytes and decode just that (r.text would guess the charset).
+        try:
+            i = raw.index(b'"')
+            payload = raw[i + 1 : raw.index(b'"', i + 1)].decode("gbk", errors="replace")
+        except ValueError:
+            raise RuntimeError(f"Unexpected quote payload: {raw[:200]!r}")
+        arr = payload.split(",")
         if len(arr) < 32:
-            raise RuntimeError(f"Unexpected quote fields={len(arr)}: {text[:200]}")
+            raise RuntimeError(f"Unexpected quote fields={len(arr)}: {payload[:200]}")
 
         def f(i: int) -> float:
             try:
@@ -296,8 +409,8 @@ class SinaProvider(Provider):
             "https://quotes.sina.cn/cn/api/json_v2.php/"
             "CN_MarketDataService.getKLineData"
         )
-        r = _get(url, params={"symbol": symbol, "scale": str(int(scale_min)), "ma": "no", "datalen": "800"})
-        js = r.json()
+        body = _HTTP.get(_SESSION, url, params={"symbol": symbol, "scale": str(int(scale_min)), "ma": "no", "datalen": "800"})
+        js = _jsonio.loads(body)
         if not isinstance(js, list):
             raise RuntimeError(f"Unexpected kline json: {str(js)[:200]}")
         out: List[Bar] = []
@@ -306,10 +419,9 @@ class SinaProvider(Provider):
             s = str(row.get("day") or "")
             if not s.startswith(prefix):
                 continue
-            dt = datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
             out.append(
                 Bar(
-                    dt=dt,
+                    dt=parse_dt(s),
                     open=to_num(row.get("open")),
                     high=to_num(row.get("high")),
                     low=to_num(row.get("low")),
@@ -318,8 +430,7 @@ class SinaProvider(Provider):
                     amount=to_num(row.get("amount")),
                 )
             )
-        out.sort(key=lambda b: b.dt)
-        return out
+        return _chronological(out)
 
 
 class ProviderChain(Provider):
@@ -351,6 +462,75 @@ class ProviderChain(Provider):
         raise RuntimeError(f"All providers failed for kline({symbol},{scale_min}m): {last_err}")
 
 
+class CachedProvider(Provider):
+    """Serve quote/kline from an on-disk FileCache before asking `inner`.
+
+    Entries live at `.cache/{symbol}/{endpoint}_{md5(params)}.json` as
+    {ts, ttl, payload}. Klines of a finished session never change, so they are
+    kept forever (ttl=None); today's kline and quotes are reused only briefly.
+    """
+
+    QUOTE_TTL_S = 30.0
+    LIVE_KLINE_TTL_S = 60.0
+
+    def __init__(self, inner: Provider, cache: FileCache):
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+
+    def describe(self) -> str:
+        return self.inner.describe()
+
+    def _key(self, symbol: str, endpoint: str, params: Dict[str, Any]) -> str:
+        h = hashlib.md5(json.dumps([self.inner.name, params], sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{symbol}/{endpoint}_{h}"
+
+    def _load(self, key: str) -> Optional[Any]:
+        entry = self.cache.load(key)
+        if not isinstance(entry, dict):
+            return None
+        ttl = entry.get("ttl")
+        if ttl is not None and _time.time() - float(entry.get("ts") or 0) >= ttl:
+            return None
+        return entry.get("payload")
+
+    def _store(self, key: str, payload: Any, ttl: Optional[float]) -> None:
+        self.cache.store(key, {"ts": _time.time(), "ttl": ttl, "payload": payload})
+
+    @staticmethod
+    def session_closed(day: date, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now()
+        return day < now.date() or (day == now.date() and now.time() > time(15, 5))
+
+    def quote(self, symbol: str) -> Quote:
+        key = self._key(symbol, "quote", {})
+        payload = self._load(key)
+        if payload is not None:
+            try:
+                dt = datetime.fromisoformat(payload["dt"]) if payload.get("dt") else None
+                return Quote(**{**payload, "dt": dt})
+            except Exception:
+                pass
+        q = self.inner.quote(symbol)
+        self._store(key, {**asdict(q), "dt": q.dt.isoformat() if q.dt else None}, self.QUOTE_TTL_S)
+        return q
+
+    def kline(self, symbol: str, *, scale_min: int, day: date) -> List[Bar]:
+        key = self._key(symbol, "kline", {"scale": int(scale_min), "day": day.isoformat()})
+        payload = self._load(key)
+        if payload:
+            try:
+                return [Bar(datetime.fromisoformat(r[0]), *r[1:]) for r in payload]
+            except Exception:
+                pass
+        bars = self.inner.kline(symbol, scale_min=scale_min, day=day)
+        if bars:
+            ttl = None if self.session_closed(day) else self.LIVE_KLINE_TTL_S
+            rows = [[b.dt.isoformat(), b.open, b.high, b.low, b.close, b.volume, b.amount] for b in bars]
+            self._store(key, rows, ttl)
+        return bars
+
+
 # -------------------------
 # Auction snapshot (optional)
 # -------------------------
@@ -362,7 +542,7 @@ def load_auction_snapshot(auction_dir: Path, symbol: str, day: date) -> Optional
     if not fp.exists():
         return None
     try:
-        return json.loads(fp.read_text(encoding="utf-8"))
+        return _jsonio.loads(fp.read_bytes())
     except Exception:
         return None
 
@@ -372,6 +552,16 @@ def load_auction_snapshot(auction_dir: Path, symbol: str, day: date) -> Optional
 # -------------------------
 
 
+# 上证 / 深成指 / 创业板, shown in every report's market-background section.
+INDEX_SYMBOLS = ("sh000001", "sz399001", "sz399006")
+
+
+def fetch_indices(provider: Provider) -> Tuple[Quote, Quote, Quote]:
+    with ThreadPoolExecutor(max_workers=len(INDEX_SYMBOLS)) as pool:
+        sh, sz, cyb = pool.map(provider.quote, INDEX_SYMBOLS)
+    return sh, sz, cyb
+
+
 def build_report(
     *,
     provider: Provider,
@@ -380,39 +570,46 @@ def build_report(
     report_date: date,
     mode: str,
     scale: int = 5,
-    watch_levels: Optional[List[float]] = None,
+    watch_levels: Optional[Sequence[float]] = None,
     auction_dir: Optional[Path] = None,
+    indices: Optional[Tuple[Quote, Quote, Quote]] = None,
 ) -> str:
-    """mode: 'mid' or 'close'"""
+    """mode: 'mid' or 'close'
+
+    An empty `stock_name` falls back to the quote's name. `indices` lets a
+    batch run fetch the three index quotes once and share them.
+    """
+
+    # Quote, kline and the three index quotes are independent I/O-bound calls;
+    # run them concurrently so latency is the slowest call, not the sum.
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        f_quote = pool.submit(provider.quote, stock_symbol)
+        f_kline = pool.submit(provider.kline, stock_symbol, scale_min=scale, day=report_date)
+        # indices (use same provider chain)
+        f_idx = [pool.submit(provider.quote, s) for s in INDEX_SYMBOLS] if indices is None else []
+        quote = f_quote.result()
+        bars_all = f_kline.result()
+        sh, sz, cyb = indices if indices is not None else (f.result() for f in f_idx)
+
+    stock_name = stock_name or quote.name or stock_symbol
 
-    quote = provider.quote(stock_symbol)
     preclose = quote.preclose
     open_ = quote.open
 
-    bars_all = provider.kline(stock_symbol, scale_min=scale, day=report_date)
-
-    # A-share sessions
-    morning_end = datetime.combine(report_date, time(11, 30))
-    if mode == "mid":
-        bars = [b for b in bars_all if b.dt <= morning_end]
-    else:
-        bars = bars_all
+    bars = BarArray.from_bars(bars_all)
+    hms = bars.hms
 
-    ohlc = summarize_ohlc(bars)
+    # A-share sessions: mid mode covers bars up to the 11:30 break.
+    ohlc = summarize_ohlc(bars, 0, bisect_right(hms, 113000) if mode == "mid" else None)
     if not ohlc:
         raise RuntimeError("No kline rows for date; market closed or data unavailable")
 
-    def segment(t0: time, t1: time) -> Optional[Ohlc]:
-        seg = [b for b in bars_all if t0 <= b.dt.time() <= t1]
-        return summarize_ohlc(seg)
-
-    seg_open30 = segment(time(9, 30), time(10, 0))
-    seg_last30 = segment(time(14, 30), time(15, 0)) if mode != "mid" else None
+    def segment(t0: int, t1: int) -> Optional[Ohlc]:
+        # bars with t0 <= HHMMSS <= t1
+        return summarize_ohlc(bars, bisect_left(hms, t0), bisect_right(hms, t1))
 
-    # indices (use same provider chain)
-    sh = provider.quote("sh000001")
-    sz = provider.quote("sz399001")
-    cyb = provider.quote("sz399006")
+    seg_open30 = segment(93000, 100000)
+    seg_last30 = segment(143000, 150000) if mode != "mid" else None
 
     # auction snapshot (optional)
     auction = load_auction_snapshot(auction_dir, stock_symbol, report_date) if auction_dir else None
@@ -429,7 +626,7 @@ def build_report(
     lines: List[str] = []
     lines.append(title)
     lines.append(f"标的：{stock_name}({stock_symbol[-6:]})")
-    lines.append(f"数据源：{quote.source} (kline={type(provider).__name__})")
+    lines.append(f"数据源：{quote.source} (kline={provider.describe()})")
     lines.append("")
 
     lines.append("1) 集合竞价/开盘")
@@ -491,22 +688,26 @@ def build_report(
     return "\n".join(lines)
 
 
-def _parse_watch(s: str) -> List[float]:
+@functools.lru_cache(maxsize=64)
+def _parse_watch(s: str) -> Tuple[float, ...]:
+    # Cached, so the result is an immutable tuple shared by every caller.
     out: List[float] = []
-    for tok in re.split(r"[ ,/]+", s.strip()):
+    for tok in _WATCH_SPLIT_RE.split(s.strip()):
         if not tok:
             continue
         try:
             out.append(float(tok))
         except Exception:
             pass
-    return out
+    return tuple(out)
 
 
 def main() -> None:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--symbol", required=True, help="Symbol like sh600158 / sz000001")
-    ap.add_argument("--name", default="", help="Optional display name")
+    sym = ap.add_mutually_exclusive_group(required=True)
+    sym.add_argument("--symbol", help="Symbol like sh600158 / sz000001")
+    sym.add_argument("--symbols", help="Batch mode: comma-separated symbols, e.g. sh600158,sz000001")
+    ap.add_argument("--name", default="", help="Optional display name (single --symbol only)")
     ap.add_argument("--mode", choices=["mid", "close"], required=True)
     ap.add_argument("--date", default="", help="YYYY-MM-DD, default: today")
     ap.add_argument("--scale", type=int, default=5, help="Kline scale minutes (1/5/15/30/60)")
@@ -522,6 +723,7 @@ def main() -> None:
         default=str(Path("data/ashare/auction")),
         help="Dir holding optional auction snapshot JSON files",
     )
+    ap.add_argument("--no-cache", action="store_true", help="Do not read/write the quote/kline cache in .cache/")
     args = ap.parse_args()
 
     d = date.today() if not args.date else datetime.strptime(args.date, "%Y-%m-%d").date()
@@ -532,25 +734,47 @@ def main() -> None:
         provider = SinaProvider()
     else:
         provider = ProviderChain([EastmoneyProvider(), SinaProvider()])
-
-    q = provider.quote(args.symbol)
-    name = args.name or q.name or args.symbol
+    if not args.no_cache:
+        provider = CachedProvider(provider, FileCache())
+    _HTTP.enabled = not args.no_cache
 
     watch = _parse_watch(args.watch) if args.watch else None
     auction_dir = Path(args.auction_dir)
 
-    print(
-        build_report(
+    def report(symbol: str, name: str = "", indices: Optional[Tuple[Quote, Quote, Quote]] = None) -> str:
+        return build_report(
             provider=provider,
-            stock_symbol=args.symbol,
+            stock_symbol=symbol,
             stock_name=name,
             report_date=d,
             mode=args.mode,
             scale=args.scale,
             watch_levels=watch,
             auction_dir=auction_dir,
+            indices=indices,
         )
-    )
+
+    if args.symbol:
+        print(report(args.symbol, args.name))
+        return
+
+    # Batch: index quotes are shared by every report, so fetch them once and
+    # build the per-symbol reports concurrently over the pooled session.
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+    indices = fetch_indices(provider)
+    failed = 0
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+        futures = [pool.submit(report, s, "", indices) for s in symbols]
+        for i, (s, f) in enumerate(zip(symbols, futures)):  # input order
+            try:
+                text = f.result()
+            except Exception as e:
+                failed += 1
+                print(f"{s}: report failed: {e}", file=sys.stderr)
+                continue
+            print(("\n" if i else "") + text)
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -17,22 +17,30 @@ Usage:
     --symbol sh600158 --target channel:1470480529609588888
 
 Env:
-  none (uses openclaw CLI installed on host)
+  DISCORD_BOT_TOKEN / TELEGRAM_BOT_TOKEN (optional). With the token for
+  --channel set, alerts are POSTed straight to the Discord/Telegram bot API;
+  otherwise they go through the openclaw CLI installed on host. Force either
+  path with --via api|openclaw.
 """
 
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import subprocess
 import sys
 from dataclasses import dataclass
 from datetime import datetime, time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import _jsonio
+from _cache import FileCache, HttpCache
 
 
 @dataclass
@@ -49,25 +57,39 @@ class Quote:
     time: str
 
 
-def _get(url: str, *, timeout: int = 10, headers: Optional[dict] = None) -> str:
-    r = requests.get(url, timeout=timeout, headers=headers)
+# Runs every minute from cron: keep the connection to Sina alive between the
+# quote and kline calls and ride out a transient 429/5xx.
+_RETRY = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_RETRY))
+
+# Minute-kline bodies (.cache/http): after the short TTL the next tick sends
+# If-None-Match / If-Modified-Since, so an unchanged kline costs a 304.
+_HTTP = HttpCache(FileCache())
+
+
+def _get(url: str, *, timeout: int = 10, headers: Optional[dict] = None) -> bytes:
+    r = _SESSION.get(url, timeout=timeout, headers=headers)
     r.raise_for_status()
-    return r.text
+    return r.content
 
 
 def fetch_sina_quote(symbol: str) -> Quote:
-    text = _get(
+    raw = _get(
         f"https://hq.sinajs.cn/list={symbol}",
         headers={"Referer": "https://finance.sina.com.cn"},
     )
-    # var hq_str_sh600158="...";
+    # var hq_str_sh600158="..."; -- the body is GBK, but only the quoted
+    # payload needs decoding (for the name), so locate it on the bytes.
     try:
-        payload = text.split('"', 2)[1]
-    except Exception:
-        raise RuntimeError(f"Unexpected quote payload: {text[:200]}")
+        i = raw.index(b'"')
+        payload = raw[i + 1 : raw.index(b'"', i + 1)].decode('gbk', errors='replace')
+    except ValueError:
+        raise RuntimeError(f"Unexpected quote payload: {raw[:200]!r}")
     arr = payload.split(',')
     if len(arr) < 32:
-        raise RuntimeError(f"Unexpected quote fields={len(arr)}: {text[:200]}")
+        raise RuntimeError(f"Unexpected quote fields={len(arr)}: {payload[:200]}")
 
     def f(i: int) -> float:
         try:
@@ -95,9 +117,7 @@ def fetch_sina_kline(symbol: str, scale: int = 1, datalen: int = 800) -> List[Di
         "CN_MarketDataService.getKLineData"
         f"?symbol={symbol}&scale={scale}&ma=no&datalen={datalen}"
     )
-    r = requests.get(url, timeout=10)
-    r.raise_for_status()
-    js = r.json()
+    js = _jsonio.loads(_HTTP.get(_SESSION, url))
     if not isinstance(js, list):
         raise RuntimeError(f"Unexpected kline json: {str(js)[:200]}")
     return js
@@ -110,14 +130,61 @@ def to_num(x: Any) -> float:
         return 0.0
 
 
-def compute_vwap(symbol: str, yyyy_mm_dd: str) -> Optional[float]:
+def _vol_amt(rows: List[Dict[str, Any]]) -> Tuple[float, float]:
+    # (sum volume, sum amount) in one pass over the rows. Sina sends numeric
+    # strings, so cast directly (`or 0` covers empty ones) and only fall back
+    # to the forgiving to_num() when a row is malformed.
+    vol = amt = 0.0
+    try:
+        for r in rows:
+            vol += float(r.get('volume') or 0)
+            amt += float(r.get('amount') or 0)
+    except (TypeError, ValueError):
+        vol = amt = 0.0
+        for r in rows:
+            vol += to_num(r.get('volume'))
+            amt += to_num(r.get('amount'))
+    return vol, amt
+
+
+# Bars fetched per tick once the running VWAP accumulator is warm.
+VWAP_TAIL_BARS = 32
+
+
+def compute_vwap(symbol: str, yyyy_mm_dd: str, state: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """Intraday VWAP from 1-minute bars.
+
+    With `state`, finished bars are folded into state['vwap_acc']
+    ({date, sum_vol, sum_amt, last_dt}) so later ticks only fetch a short tail
+    instead of the whole day. The newest bar may still be filling, so it is
+    added on top of the running sums but never accumulated.
+    """
     # Minute kline may start at 09:31; it's fine for a practical intraday VWAP.
-    rows = fetch_sina_kline(symbol, scale=1, datalen=1000)
-    rows = [r for r in rows if str(r.get('day', '')).startswith(yyyy_mm_dd)]
-    if not rows:
-        return None
-    vol = sum(to_num(r.get('volume')) for r in rows)
-    amt = sum(to_num(r.get('amount')) for r in rows)
+    acc = (state or {}).get('vwap_acc')
+    rows = None
+    if acc and acc.get('date') == yyyy_mm_dd:
+        tail = fetch_sina_kline(symbol, scale=1, datalen=VWAP_TAIL_BARS)
+        first = str(tail[0].get('day', '')) if tail else ''
+        # A tail that starts after last_dt on the same day means ticks were missed.
+        if not (first.startswith(yyyy_mm_dd) and first > acc['last_dt']):
+            rows = [r for r in tail if str(r.get('day', '')).startswith(yyyy_mm_dd) and str(r['day']) > acc['last_dt']]
+    if rows is None:
+        acc = {'date': yyyy_mm_dd, 'sum_vol': 0.0, 'sum_amt': 0.0, 'last_dt': ''}
+        rows = fetch_sina_kline(symbol, scale=1, datalen=1000)
+        rows = [r for r in rows if str(r.get('day', '')).startswith(yyyy_mm_dd)]
+
+    done, live = rows[:-1], rows[-1:]
+    if done:
+        vol, amt = _vol_amt(done)
+        acc['sum_vol'] += vol
+        acc['sum_amt'] += amt
+        acc['last_dt'] = str(done[-1]['day'])
+    if state is not None:
+        state['vwap_acc'] = acc
+
+    vol, amt = _vol_amt(live)
+    vol += acc['sum_vol']
+    amt += acc['sum_amt']
     if not vol:
         return None
     return amt / vol
@@ -145,18 +212,49 @@ def load_state(path: Path) -> Dict[str, Any]:
     if not path.exists():
         return {}
     try:
-        return json.loads(path.read_text(encoding='utf-8'))
+        return _jsonio.loads(path.read_bytes())
     except Exception:
         return {}
 
 
 def save_state(path: Path, state: Dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding='utf-8')
+    # Write a temp file and rename it over the state file, so an overlapping
+    # cron run never reads a half-written file.
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(_jsonio.dumps(state, indent=True), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+# Bot token env var per --channel for direct API delivery.
+_TOKEN_ENV = {"discord": "DISCORD_BOT_TOKEN", "telegram": "TELEGRAM_BOT_TOKEN"}
+
+
+def _send_api(channel: str, target: str, message: str, token: str) -> None:
+    # The Telegram token is part of the URL, and requests puts the URL into its
+    # exception messages; report failures by channel and status only.
+    try:
+        if channel == "discord":
+            channel_id = target.split(":", 1)[1] if target.startswith("channel:") else target
+            r = _SESSION.post(
+                f"https://discord.com/api/v10/channels/{channel_id}/messages",
+                json={"content": message},
+                headers={"Authorization": f"Bot {token}"},
+                timeout=10,
+            )
+        else:
+            r = _SESSION.post(
+                f"https://api.telegram.org/bot{token}/sendMessage",
+                json={"chat_id": target, "text": message},
+                timeout=10,
+            )
+    except requests.RequestException as e:
+        raise RuntimeError(f"{channel} API request failed ({type(e).__name__})") from None
+    if not r.ok:
+        raise RuntimeError(f"{channel} API answered HTTP {r.status_code}")
 
 
-def send_message(channel: str, target: str, message: str) -> None:
-    """Send via OpenClaw CLI (no LLM)."""
+def _send_openclaw(channel: str, target: str, message: str) -> None:
     cmd = [
         "openclaw",
         "message",
@@ -171,6 +269,30 @@ def send_message(channel: str, target: str, message: str) -> None:
     subprocess.run(cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 
+def send_message(channel: str, target: str, message: str, *, via: str = "auto") -> None:
+    """Send one alert (no LLM).
+
+    via='auto' POSTs to the bot API when the channel's token env var is set
+    (no subprocess per alert) and falls back to the OpenClaw CLI otherwise,
+    including when the API call fails. Like the CLI path (check=False), a
+    failed delivery is reported on stderr and never aborts the tick.
+    """
+    if via != "openclaw" and channel in _TOKEN_ENV:
+        token = os.environ.get(_TOKEN_ENV[channel], "")
+        if token:
+            try:
+                _send_api(channel, target, message, token)
+                return
+            except RuntimeError as e:  # _send_api wraps requests errors
+                if via == "api":
+                    print(f"alert not delivered: {e}", file=sys.stderr)
+                    return
+    if via == "api":
+        print(f"alert not delivered: no {_TOKEN_ENV.get(channel, 'bot token')} for channel {channel!r}", file=sys.stderr)
+        return
+    _send_openclaw(channel, target, message)
+
+
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--symbol", required=True, help="Sina symbol, e.g. sh600158")
@@ -180,7 +302,21 @@ def main() -> None:
     ap.add_argument("--levels", default="10.00,10.03", help="Comma levels for upside touch (used if --config not set)")
     ap.add_argument("--breakdown", default="9.86", help="Break below level (used if --config not set)")
     ap.add_argument("--state-dir", default="data/ashare/alerts", help="Directory to store state")
+    ap.add_argument("--no-cache", action="store_true", help="Do not read/write the kline cache in .cache/")
+    ap.add_argument(
+        "--via",
+        choices=["auto", "api", "openclaw"],
+        default="auto",
+        help="Delivery: api=bot API (needs *_BOT_TOKEN), openclaw=CLI, auto=api if token set else openclaw",
+    )
     args = ap.parse_args()
+    _HTTP.enabled = not args.no_cache
+    # Fail before any trigger is marked as fired, not when the alert is due.
+    if args.via == "api":
+        if args.channel not in _TOKEN_ENV:
+            ap.error(f"--via api supports --channel {'/'.join(_TOKEN_ENV)} only")
+        if not os.environ.get(_TOKEN_ENV[args.channel]):
+            ap.error(f"--via api needs {_TOKEN_ENV[args.channel]} in the environment")
 
     now = datetime.now()
     if not is_trading_time(now):
@@ -189,7 +325,7 @@ def main() -> None:
     cfg = {}
     if args.config:
         try:
-            cfg = json.loads(Path(args.config).read_text(encoding='utf-8'))
+            cfg = _jsonio.loads(Path(args.config).read_bytes())
         except Exception:
             cfg = {}
 
@@ -197,6 +333,8 @@ def main() -> None:
     day = q.date  # YYYY-MM-DD
     state_path = Path(args.state_dir) / f"{day}_{args.symbol}.json"
     state = load_state(state_path)
+    # Only touch the state file when something in it actually changed.
+    saved = _jsonio.dumps(state) if state else None
 
     # reset if date changed (safety)
     if state.get("date") != day:
@@ -204,16 +342,29 @@ def main() -> None:
 
     fired: Dict[str, bool] = state.setdefault("fired", {})
 
-    vwap = None
-    try:
-        vwap = compute_vwap(args.symbol, day)
-    except Exception:
-        vwap = None
+    def persist() -> None:
+        nonlocal saved
+        text = _jsonio.dumps(state)
+        if text != saved:
+            save_state(state_path, state)
+            saved = text
+
+    # VWAP needs the minute kline; only fetch it once a trigger actually needs
+    # it (the VWAP cross check, or a level/breakdown message being sent).
+    @lru_cache(maxsize=1)
+    def get_vwap() -> Optional[float]:
+        try:
+            return compute_vwap(args.symbol, day, state)
+        except Exception:
+            return None
 
-    last_rel = state.get("vwap_rel")  # 'above'|'below'|None
-    rel = None
-    if vwap:
-        rel = "above" if q.price > vwap else "below" if q.price < vwap else "equal"
+    vwap_cross_enabled = bool(cfg.get('vwap_cross', True))
+
+    def cheap_vwap() -> Optional[float]:
+        # Level/breakdown triggers only need the quote. Their messages carry a
+        # VWAP line when the cross check fetches it this tick anyway; with the
+        # check off, no kline download just for the message.
+        return get_vwap() if vwap_cross_enabled else None
 
     change = pct(q.price, q.preclose)
     ts = f"{q.date} {q.time}"
@@ -223,8 +374,8 @@ def main() -> None:
             return
         fired[key] = True
         state["last_fire_at"] = ts
-        save_state(state_path, state)
-        send_message(args.channel, args.target, text)
+        persist()
+        send_message(args.channel, args.target, text, via=args.via)
 
     # Resolve triggers (config overrides CLI defaults)
     # Config schema example:
@@ -244,6 +395,7 @@ def main() -> None:
     for lv in levels:
         key = f"touch_up_{lv:.2f}"
         if q.price >= lv and not fired.get(key):
+            vwap = cheap_vwap()
             msg = (
                 f"【盘中提醒】{q.name}({args.symbol[-6:]}) 触达 {lv:.2f}\n"
                 f"- 时间：{ts}\n"
@@ -261,6 +413,7 @@ def main() -> None:
         bd = float(args.breakdown)
     key_bd = f"break_dn_{bd:.2f}"
     if q.price < bd and not fired.get(key_bd):
+        vwap = cheap_vwap()
         msg = (
             f"【盘中提醒】{q.name}({args.symbol[-6:]}) 跌破 {bd:.2f}\n"
             f"- 时间：{ts}\n"
@@ -271,8 +424,12 @@ def main() -> None:
         fire(key_bd, msg)
         return
 
-    # VWAP cross (can be disabled)
-    vwap_cross_enabled = bool(cfg.get('vwap_cross', True))
+    # VWAP cross (can be disabled); the only trigger that needs the kline.
+    vwap = get_vwap() if vwap_cross_enabled else None
+    last_rel = state.get("vwap_rel")  # 'above'|'below'|None
+    rel = None
+    if vwap:
+        rel = "above" if q.price > vwap else "below" if q.price < vwap else "equal"
     if vwap_cross_enabled and vwap and rel in ("above", "below"):
         if last_rel and last_rel != rel:
             key = f"vwap_cross_{rel}"
@@ -287,10 +444,11 @@ def main() -> None:
                 )
                 fire(key, msg)
                 state["vwap_rel"] = rel
-                save_state(state_path, state)
+                persist()
                 return
         state["vwap_rel"] = rel
-        save_state(state_path, state)
+    # vwap_rel and the running VWAP sums change from tick to tick.
+    persist()
 
 
 if __name__ == "__main__":